@@ -1,43 +1,38 @@
 """This file represents the main entry point into the bot application.
 """
-import asyncio
-import contextlib
-import copy
+
 import importlib.util
+import itertools
 import logging
 import os
 import os.path
 import sys
 import types
-from typing import Any
+from collections import ChainMap
+from typing import TYPE_CHECKING, Any, NoReturn
 
 import click
-import discord
-from discord.ext import commands
-import snakecore  # TODO: Remove this if not using snakecore
-
-from .bot import (
-    TemplateBot as Bot,
-)  # TODO: Rename TemplateBot according to your bot application.
-
-try:
-    import uvloop  # type: ignore
-except ImportError:
-    pass
-else:
-    # uvloop replaces the default Python event loop with a cythonized version.
-    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
-
-LOG_LEVEL_NAMES: set[str] = {
-    "CRITICAL",
-    "FATAL",
-    "ERROR",
-    "WARN",
-    "WARNING",
-    "INFO",
-    "DEBUG",
-    "NOTSET",
-}
+
+# discord.py, snakecore, the bot class and asyncio are imported where they are
+# first needed, so that e.g. '--help' or configuration errors don't pay for their
+# import chains.
+if TYPE_CHECKING:
+    from .bot import (
+        TemplateBot as Bot,
+    )  # TODO: Rename TemplateBot according to your bot application.
+
+LOG_LEVEL_NAMES: frozenset[str] = frozenset(
+    {
+        "CRITICAL",
+        "FATAL",
+        "ERROR",
+        "WARN",
+        "WARNING",
+        "INFO",
+        "DEBUG",
+        "NOTSET",
+    }
+)
 
 
 DEFAULT_EXTENSIONS: list[dict[str, Any]] = [
@@ -47,20 +42,153 @@ DEFAULT_EXTENSIONS: list[dict[str, Any]] = [
 ]
 
 
-DEFAULT_CONFIG = {
-    "intents": discord.Intents.default().value,
-    "command_prefix": "!",
-    "mention_as_command_prefix": False,
-    "extensions": [
-        {"name": f"{__package__}.exts.ping_pong"},  # TODO: Remove this extension entry
-    ],
-}
+def _fresh_default_config() -> dict[str, Any]:
+    # 'intents' defaults to discord.py's default intents, which are only looked up
+    # if no other value was provided, to avoid importing discord.py early.
+    return {
+        "command_prefix": "!",
+        "mention_as_command_prefix": False,
+        "extensions": [
+            # TODO: Remove this extension entry
+            {"name": f"{__package__}.exts.ping_pong"},
+        ],
+    }
+
+
+# Set 'PGCBOT_CONFIG_CACHE=1' to cache the 'config' dictionaries of loaded
+# configuration files, one cache file per path, invalidated by the modification
+# time and size of the file and of any files it is declared to depend on.
+# Configuration files that produce dynamic data (e.g. by reading credentials
+# from environment variables) must not be cached.
+CONFIG_CACHE_ENABLED = os.environ.get("PGCBOT_CONFIG_CACHE") == "1"
+CONFIG_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pgcbot")
+
+
+def _stat_or_none(file_path: str) -> os.stat_result | None:
+    try:
+        return os.stat(file_path)
+    except OSError:
+        return None
+
+
+def _config_cache_sources(
+    abs_file_path: str, file_stat: os.stat_result, dependency_paths: tuple[str, ...]
+) -> list[tuple[str, int | None, int | None]]:
+    sources: list[tuple[str, int | None, int | None]] = [
+        (abs_file_path, file_stat.st_mtime_ns, file_stat.st_size)
+    ]
+    for dependency_path in dependency_paths:
+        abs_dependency_path = os.path.abspath(dependency_path)
+        dependency_stat = _stat_or_none(abs_dependency_path)
+        sources.append(
+            (abs_dependency_path, None, None)
+            if dependency_stat is None
+            else (
+                abs_dependency_path,
+                dependency_stat.st_mtime_ns,
+                dependency_stat.st_size,
+            )
+        )
+
+    return sources
+
+
+def _config_cache_path(abs_file_path: str) -> str:
+    import hashlib
+
+    digest = hashlib.sha256(abs_file_path.encode()).hexdigest()
+    return os.path.join(CONFIG_CACHE_DIR, f"{digest}.pkl")
+
+
+def _load_cached_config_module(
+    module_name: str, cache_path: str, sources: list[tuple[str, int | None, int | None]]
+) -> types.ModuleType | None:
+    import pickle
+
+    try:
+        with open(cache_path, "rb") as cache_file:
+            data = pickle.load(cache_file)
+    except Exception:
+        # e.g. a corrupt cache file or one referring to classes that no longer exist
+        return None
+
+    if (
+        not isinstance(data, dict)
+        or "config" not in data
+        or data.get("sources") != sources
+    ):
+        return None
+
+    module = types.ModuleType(module_name)
+    module.config = data["config"]  # type: ignore
+    sys.modules[module_name] = module
+    return module
+
+
+def _store_cached_config_module(
+    module: types.ModuleType,
+    cache_path: str,
+    sources: list[tuple[str, int | None, int | None]],
+) -> None:
+    import pickle
+    import tempfile
+
+    try:
+        config_data = module.config  # type: ignore
+    except AttributeError:
+        return
 
-config: dict = copy.deepcopy(DEFAULT_CONFIG)
+    # cached data may contain credentials, so keep it private to the current user
+    try:
+        os.makedirs(CONFIG_CACHE_DIR, mode=0o700, exist_ok=True)
+        os.chmod(CONFIG_CACHE_DIR, 0o700)
+        # mkstemp creates the file with 0o600 permissions
+        fd, temp_path = tempfile.mkstemp(dir=CONFIG_CACHE_DIR, suffix=".tmp")
+    except OSError:
+        return
 
+    try:
+        with os.fdopen(fd, "wb") as cache_file:
+            pickle.dump(
+                {"sources": sources, "config": config_data},
+                cache_file,
+            )
+        # replacing the previous cache file of the same path keeps no stale entries
+        os.replace(temp_path, cache_path)
+    except Exception:
+        # unpicklable or unwritable config data is simply not cached
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def import_module_from_path(
+    module_name: str,
+    file_path: str,
+    file_stat: os.stat_result | None = None,
+    cache_dependencies: tuple[str, ...] = (),
+) -> types.ModuleType:
+    # paths resolved by the CLI are already absolute, so don't look up the working
+    # directory again for those
+    abs_file_path = (
+        file_path if os.path.isabs(file_path) else os.path.abspath(file_path)
+    )
+
+    cache_path = None
+    cache_sources = None
+    if CONFIG_CACHE_ENABLED and (
+        file_stat is not None or (file_stat := _stat_or_none(abs_file_path))
+    ):
+        cache_path = _config_cache_path(abs_file_path)
+        cache_sources = _config_cache_sources(
+            abs_file_path, file_stat, cache_dependencies
+        )
+        if (
+            module := _load_cached_config_module(module_name, cache_path, cache_sources)
+        ) is not None:
+            return module
 
-def import_module_from_path(module_name: str, file_path: str) -> types.ModuleType:
-    abs_file_path = os.path.abspath(file_path)
     spec = importlib.util.spec_from_file_location(module_name, abs_file_path)
     if spec is None:
         raise ImportError(
@@ -74,10 +202,21 @@ def import_module_from_path(module_name: str, file_path: str) -> types.ModuleTyp
         raise ImportError(
             f"failed to find code for module named '{module_name}' at '{abs_file_path}'"
         ) from fnf
+
+    if cache_path and cache_sources is not None:
+        _store_cached_config_module(module, cache_path, cache_sources)
+
     return module
 
 
+def _abort(message: str) -> NoReturn:
+    click.secho(f"  {message}", err=True, fg="red")
+    raise click.Abort()
+
+
 def setup_logging(log_level: int = logging.INFO) -> None:
+    import discord
+
     discord.utils.setup_logging(level=log_level)
 
 
@@ -90,16 +229,27 @@ def clear_logging_handlers(logger: logging.Logger | None = None):
         logger.removeHandler(handler)
 
 
-@contextlib.contextmanager
-def logging_handling(log_level: int = logging.INFO):
-    try:
-        setup_logging(log_level=log_level)
-        yield
-    finally:
-        clear_logging_handlers()
+# Set 'PGCBOT_CLEAN_SHUTDOWN=1' to always clear logging handlers after the bot stops.
+# By default, this only happens if it stopped due to an exception, as the process
+# exits right afterwards anyway.
+CLEAN_SHUTDOWN_ENABLED = os.environ.get("PGCBOT_CLEAN_SHUTDOWN") == "1"
+
+
+class logging_handling:
+    def __init__(self, log_level: int = logging.INFO) -> None:
+        self.log_level = log_level
+
+    def __enter__(self) -> None:
+        setup_logging(log_level=self.log_level)
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is not None or CLEAN_SHUTDOWN_ENABLED:
+            clear_logging_handlers()
 
 
-async def start_bot(bot: Bot) -> None:
+async def start_bot(bot: "Bot") -> None:
+    import snakecore  # TODO: Remove this if not using snakecore
+
     try:
         await snakecore.init(
             global_client=bot
@@ -112,7 +262,9 @@ async def start_bot(bot: Bot) -> None:
         await close_bot(bot)
 
 
-async def close_bot(bot: Bot) -> None:
+async def close_bot(bot: "Bot") -> None:
+    import snakecore  # TODO: Remove this if not using snakecore
+
     print("Closing bot...")
     await bot.close()
     await snakecore.quit()  # TODO: Remove this if not using snakecore
@@ -133,14 +285,14 @@ async def close_bot(bot: Bot) -> None:
     "will occur.")
 @click.option("--intents", type=str,
     help=("The integer of bot intents as bitwise flags to be used by the bot instead "
-    f"of discord.py's defaults ({bin(DEFAULT_CONFIG['intents'])}). "
+    "of discord.py's defaults. "
     "It can be specified as a base 2, 8, 10 or 16 integer literal. Note that the "
     "message content intent (1 << 15) flag is not set by default. See more at "
     "https://discord.com/developers/docs/topics/gateway#list-of-intents"))
 @click.option("--command-prefix", "--prefix", "command_prefix", multiple=True,
     show_default=True, type=str,
     help=("The command prefix(es) to use. "
-    f"By default, {DEFAULT_CONFIG['command_prefix']} is used as a prefix."))
+    "By default, ! is used as a prefix."))
 @click.option("--mention-as-command-prefix", "--mention-as-prefix",
     "mention_as_command_prefix", is_flag=True,
     help="Enable the usage of bot mentions as a prefix.")
@@ -182,43 +334,45 @@ def main(
     if ctx.invoked_subcommand is not None:
         return
 
+    # layered in order of precedence: CLI overrides and other writes during
+    # validation, 'localconfig.py', 'config.py', defaults
+    config: ChainMap[str, Any] = ChainMap(_fresh_default_config())
+
     click.echo("Searching for configuration files...")
     config_loading_failed = False
+    # reused when loading 'localconfig.py', if it had to be looked up already
+    localconfig_stat = None
 
     if config_path:
         # load config data
         try:
             config_module = import_module_from_path("config", config_path)
-            try:
-                config.update(config_module.config)
-            except AttributeError:
-                click.secho(
-                    "  Could not find 'config' data dictionary in 'config.py' "
-                    f"file at path '{config_path}'.",
-                    err=True,
-                    fg="red",
-                )
-                raise click.Abort()
-            else:
-                click.secho(
-                    f"  Successfully loaded 'config' data from path '{config_path}'"
+            if not isinstance(getattr(config_module, "config", None), dict):
+                _abort(
+                    "Could not find 'config' data dictionary in 'config.py' "
+                    f"file at path '{config_path}'."
                 )
+
+            config = config.new_child(config_module.config)
+            click.secho(
+                f"  Successfully loaded 'config' data from path '{config_path}'"
+            )
         except ImportError:
-            if localconfig_path and os.path.exists(localconfig_path):
+            if (
+                localconfig_path
+                and (localconfig_stat := _stat_or_none(localconfig_path)) is not None
+            ):
                 click.secho(
                     f"  Could not find 'config.py' file at path '{config_path}', "
                     "looking for 'localconfig.py'...",
                     fg="yellow",
                 )
             else:
-                click.secho(
-                    f"  Could not find 'config.py' file"
+                _abort(
+                    f"Could not find 'config.py' file"
                     + (f" at '{config_path}'" if config_path else "")
-                    + f" or 'localconfig.py' file at path '{localconfig_path}'",
-                    err=True,
-                    fg="red",
+                    + f" or 'localconfig.py' file at path '{localconfig_path}'"
                 )
-                raise click.Abort()
 
             config_loading_failed = True
 
@@ -226,87 +380,70 @@ def main(
         # load optional localconfig data
         try:
             localconfig_module = import_module_from_path(
-                "localconfig", localconfig_path
+                "localconfig",
+                localconfig_path,
+                localconfig_stat,
+                # 'localconfig.py' may build on 'config.py' via 'import config'
+                cache_dependencies=(config_path,) if config_path else (),
             )
-            try:
-                config.update(localconfig_module.config)
-            except AttributeError:
-                click.secho(
-                    "  Could not find the 'config' data dictionary in the "
-                    f"'localconfig.py' file at path '{localconfig_path}'.",
-                    err=True,
-                    fg="red",
+            if not isinstance(getattr(localconfig_module, "config", None), dict):
+                _abort(
+                    "Could not find the 'config' data dictionary in the "
+                    f"'localconfig.py' file at path '{localconfig_path}'."
                 )
-                raise click.Abort()
+
+            config = config.new_child(localconfig_module.config)
         except ImportError:
             if not config_path or config_loading_failed:
-                click.secho(
-                    f"  Could not find 'config.py' file"
+                _abort(
+                    f"Could not find 'config.py' file"
                     + (f" at path '{config_path}'" if config_path else "")
-                    + f" or 'localconfig.py' file at path {localconfig_path}",
-                    err=True,
-                    fg="red",
+                    + f" or 'localconfig.py' file at path {localconfig_path}"
                 )
-                raise click.Abort()
             click.echo("  No 'localconfig.py' file found, continuing...")
         else:
             click.echo(f"  Successfully loaded 'localconfig' from {localconfig_path}")
 
     click.echo("Reading configuration data...")
 
+    config = config.new_child()
+
     # -------------------------------------------------------------------------
     # config.authentication
     ## config.authentication.token
 
-    if (
-        "authentication" not in config or not isinstance(config["authentication"], dict)
-    ) or (
-        "token" not in config["authentication"]
-        or not isinstance(config["authentication"]["token"], str)
+    authentication = config.get("authentication")
+
+    if not isinstance(authentication, dict) or not isinstance(
+        authentication.get("token"), str
     ):
-        click.secho(
-            "  config error: 'authentication' variable must be of type 'dict' "
-            "and must at least contain 'token' of type 'str'",
-            err=True,
-            fg="red",
+        _abort(
+            "config error: 'authentication' variable must be of type 'dict' "
+            "and must at least contain 'token' of type 'str'"
         )
-        raise click.Abort()
 
     # -------------------------------------------------------------------------
     # config.intents
 
     if intents is not None:
         config["intents"] = intents
+    elif "intents" not in config:
+        import discord
 
-    if not isinstance(config["intents"], int):
-        intents_fail = False
-        if isinstance(config["intents"], str):
-            try:
-                config["intents"] = int(
-                    config["intents"],
-                    base=(
-                        2
-                        if (base_hint := config["intents"][:2]) == "0b"
-                        else 8
-                        if base_hint == "0o"
-                        else 16
-                        if base_hint == "0x"
-                        else 10
-                    ),
-                )
-            except ValueError:
-                intents_fail = True
-        else:
-            intents_fail = True
+        config["intents"] = discord.Intents.default().value
 
-        if intents_fail:
-            click.secho(
-                "  config error: 'intents' variable must be of type 'int' or 'str' (STRING) "
-                "and must be interpretable as an integer.",
-                err=True,
-                fg="red",
-            )
-            raise click.Abort()
+    if isinstance(config["intents"], str):
+        try:
+            # base 0 detects '0b', '0o' and '0x' prefixes and defaults to base 10
+            config["intents"] = int(config["intents"].strip(), 0)
+        except ValueError:
+            pass
+
+    if not isinstance(config["intents"], int):
+        _abort(
+            "config error: 'intents' variable must be of type 'int' or 'str' (STRING) "
+            "and must be interpretable as an integer."
+        )
 
     # -------------------------------------------------------------------------
     # config.command_prefix
@@ -317,75 +454,62 @@ def main(
     if command_prefix:
         config["command_prefix"] = command_prefix
 
-    if (
-        config["command_prefix"] is not None
-        and not isinstance(config["command_prefix"], (str, list, tuple))
-    ) or (
-        isinstance(config["command_prefix"], (list, tuple))
-        and not all(isinstance(pfx, str) for pfx in config["command_prefix"])
+    prefix = config["command_prefix"]
+
+    if (prefix is not None and not isinstance(prefix, (str, list, tuple))) or (
+        isinstance(prefix, (list, tuple))
+        and not all(isinstance(pfx, str) for pfx in prefix)
     ):
-        click.secho(
-            "  config error: Optional 'command_prefix' variable must be of type "
-            "'str', of type 'list'/'tuple' containing strings or just None.",
-            err=True,
-            fg="red",
+        _abort(
+            "config error: Optional 'command_prefix' variable must be of type "
+            "'str', of type 'list'/'tuple' containing strings or just None."
         )
-        raise click.Abort()
 
     if mention_as_command_prefix:
         config["mention_as_command_prefix"] = mention_as_command_prefix
 
-    if not isinstance(config["mention_as_command_prefix"], bool):
-        click.secho(
-            "  config error: 'mention_as_command_prefix' variable must be of type 'bool'.",
-            err=True,
-            fg="red",
-        )
-        raise click.Abort()
-
-    if config["command_prefix"] is not None and config["mention_as_command_prefix"]:
-        final_prefix = commands.when_mentioned_or(
-            *(
-                (config["command_prefix"],)
-                if isinstance(config["command_prefix"], str)
-                else config["command_prefix"]
-            )
+    mention_as_prefix = config["mention_as_command_prefix"]
+
+    if not isinstance(mention_as_prefix, bool):
+        _abort(
+            "config error: 'mention_as_command_prefix' variable must be of type 'bool'."
         )
-    elif config["command_prefix"] is not None:
-        final_prefix = config["command_prefix"]
-    elif config["mention_as_command_prefix"]:
+
+    from discord.ext import commands
+
+    prefixes: tuple[str, ...] = (
+        (prefix,) if isinstance(prefix, str) else tuple(prefix or ())
+    )
+
+    if prefix is not None and mention_as_prefix:
+        final_prefix = commands.when_mentioned_or(*prefixes)
+    elif prefix is not None:
+        final_prefix = prefix
+    elif mention_as_prefix:
         final_prefix = commands.when_mentioned
     else:
-        click.secho(
-            "  config error: 'mention_as_command_prefix' variable must be True if 'command_prefix' is None.",
-            err=True,
-            fg="red",
+        _abort(
+            "config error: 'mention_as_command_prefix' variable must be True if 'command_prefix' is None."
         )
-        raise click.Abort()
 
     # -------------------------------------------------------------------------
     # config.extensions
 
-    if not isinstance(config["extensions"], (list, tuple)):
-        click.secho(
-            "  config error: 'exts' variable must be a container of type 'list'/'tuple' "
-            "containing dictionaries that specify parameters for the extensions to load.",
-            err=True,
-            fg="red",
+    extensions = config["extensions"]
+
+    if not isinstance(extensions, (list, tuple)):
+        _abort(
+            "config error: 'exts' variable must be a container of type 'list'/'tuple' "
+            "containing dictionaries that specify parameters for the extensions to load."
         )
-        raise click.Abort()
 
-    elif config["extensions"] and not all(
-        isinstance(ext_dict, dict) and "name" in ext_dict
-        for ext_dict in config["extensions"]
+    elif extensions and not all(
+        isinstance(ext_dict, dict) and "name" in ext_dict for ext_dict in extensions
     ):
-        click.secho(
-            "  config error: The objects in the 'exts' variable container must be of type 'dict' "
-            "and must at least contain the 'name' key mapping to the string name of an extension to load.",
-            err=True,
-            fg="red",
+        _abort(
+            "config error: The objects in the 'exts' variable container must be of type 'dict' "
+            "and must at least contain the 'name' key mapping to the string name of an extension to load."
         )
-        raise click.Abort()
 
     # -------------------------------------------------------------------------
     # config.log_level
@@ -396,13 +520,19 @@ def main(
         else:
             config["log_level"] = None
 
-    elif config["log_level"] is not None and config["log_level"] not in LOG_LEVEL_NAMES:
-        click.secho(
-            "  config error: 'log_level' variable must be a valid log level name of type 'str' or None.",
-            err=True,
-            fg="red",
+    elif (config_log_level := config["log_level"]) is not None and (
+        not isinstance(config_log_level, str) or config_log_level not in LOG_LEVEL_NAMES
+    ):
+        _abort(
+            "config error: 'log_level' variable must be a valid log level name of type 'str' or None."
         )
-        raise click.Abort()
+
+    # validated names always map to an 'int' level
+    log_level_value: int | None = (
+        logging.getLevelName(config["log_level"])
+        if config["log_level"] is not None
+        else None
+    )
 
     # -------------------------------------------------------------------------
     # TODO: Add support for more config variables as desired
@@ -414,38 +544,58 @@ def main(
     if ignore_all_extensions:
         config["extensions"] = []
     else:
-        default_extensions = DEFAULT_EXTENSIONS
-        extra_extensions = config["extensions"]
-        final_extensions = []
+        extension_sources = []
 
         if not ignore_default_extensions:
-            final_extensions.extend(default_extensions)
+            extension_sources.append(DEFAULT_EXTENSIONS)
         if not ignore_extra_extensions:
-            final_extensions.extend(extra_extensions)
+            extension_sources.append(config["extensions"])
 
-        if ignore_extension:
-            ignore_extension_set = set(ignore_extension)
-            final_extensions = [
-                ext_dict
-                for ext_dict in final_extensions
-                if ext_dict["name"] not in ignore_extension_set
-            ]
+        ignore_extension_set = frozenset(ignore_extension)
+        config["extensions"] = [
+            ext_dict
+            for ext_dict in itertools.chain.from_iterable(extension_sources)
+            if ext_dict["name"] not in ignore_extension_set
+        ]
 
-        config["extensions"] = final_extensions
+    import discord
+
+    from .bot import (
+        TemplateBot as Bot,
+    )  # TODO: Rename TemplateBot according to your bot application.
 
     # pass configuration data to bot instance
     bot = Bot(final_prefix, intents=discord.Intents(config["intents"]))  # type: ignore
 
-    bot._config = config
+    bot._config = dict(config)
+    bot._raw_prefix_config = (prefixes, mention_as_prefix)
+    bot._launch_extensions = [
+        (
+            ext_dict["name"],
+            ext_dict.get("package"),
+            ext_dict.get("config"),
+            f"{ext_dict.get('package') or ''}{ext_dict['name']}",
+        )
+        for ext_dict in config["extensions"]
+    ]
 
-    if (
-        config["log_level"] is not None
-    ):  #  not specifying a logging level disables logging
-        with logging_handling(log_level=logging.getLevelName(config["log_level"])):
-            asyncio.run(start_bot(bot))
+    try:
+        import uvloop  # type: ignore
+    except ImportError:
+        import asyncio
+
+        run = asyncio.run
+    else:
+        # uvloop replaces the default Python event loop with a cythonized version,
+        # without changing the process-wide event loop policy.
+        run = uvloop.run
+
+    if log_level_value is not None:  #  not specifying a logging level disables logging
+        with logging_handling(log_level=log_level_value):
+            run(start_bot(bot))
             return
 
-    asyncio.run(start_bot(bot))
+    run(start_bot(bot))
 
 
 if __name__ == "__main__":
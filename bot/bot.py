@@ -3,8 +3,9 @@
 
 import asyncio
 import logging
-from typing import Optional
+from typing import Any, Optional, Union
 
+import discord
 from discord.ext import commands
 import snakecore  # TODO: Remove this if not using snakecore
 
@@ -17,15 +18,52 @@ class TemplateBot(snakecore.commands.Bot):
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
         self._config: dict = {}
+        # (name, package, config, display name) tuples of the extensions to load
+        # at launch, pre-parsed from `self._config["extensions"]`.
+        self._launch_extensions: list[
+            tuple[str, Optional[str], Optional[dict[str, Any]], str]
+        ] = []
+        # (prefixes, mention as prefix) pair used to build `_cached_prefixes`.
+        self._raw_prefix_config: Optional[tuple[tuple[str, ...], bool]] = None
+        self._cached_prefixes: Optional[list[str]] = None
+        # the cache only applies while `command_prefix` is still its launch value
+        self._launch_command_prefix: Any = self.command_prefix
+
+    async def get_prefix(self, message: discord.Message, /) -> Union[list[str], str]:
+        # prefixes are fixed at launch, so they are only built once instead of
+        # on every message, unless `command_prefix` gets replaced (e.g. by an
+        # extension) at any point
+        if self.command_prefix is not self._launch_command_prefix:
+            return await super().get_prefix(message)
+
+        if self._cached_prefixes is not None:
+            return self._cached_prefixes
+
+        if self._raw_prefix_config is None or self.user is None:
+            return await super().get_prefix(message)
+
+        raw_prefixes, mention_as_prefix = self._raw_prefix_config
+        if mention_as_prefix:
+            user_id = self.user.id
+            prefixes = [f"<@{user_id}> ", f"<@!{user_id}> ", *raw_prefixes]
+        elif raw_prefixes:
+            prefixes = list(raw_prefixes)
+        else:
+            # let discord.py handle an empty prefix list as usual
+            return await super().get_prefix(message)
+
+        self._cached_prefixes = prefixes
+        return prefixes
 
     async def setup_hook(self) -> None:
-        for ext_dict in self._config["extensions"]:
+        # TODO: Rename this to `load_extension` if not using snakecore
+        load_extension = self.load_extension_with_config
+        for name, package, ext_config, display_name in self._launch_extensions:
             try:
-                await self.load_extension_with_config(
-                    # TODO: Rename this to `load_extension` if not using snakecore
-                    ext_dict["name"],
-                    package=ext_dict.get("package"),
-                    config=ext_dict.get("config"),
+                await load_extension(
+                    name,
+                    package=package,
+                    config=ext_config,
                     # TODO: Remove the `config=` argument above if not using snakecore
                 )
             except commands.ExtensionAlreadyLoaded:
@@ -33,10 +71,11 @@ class TemplateBot(snakecore.commands.Bot):
 
             except (TypeError, commands.ExtensionError) as exc:
                 _logger.error(
-                    f"Failed to load extension '{ext_dict.get('package', '')}{ext_dict['name']}' at launch",
+                    "Failed to load extension '%s' at launch",
+                    display_name,
                     exc_info=exc,
                 )
             else:
                 _logger.info(
-                    f"Successfully loaded extension '{ext_dict.get('package', '')}{ext_dict['name']}' at launch"
+                    "Successfully loaded extension '%s' at launch", display_name
                 )